@@ -1,6 +1,152 @@
+import os
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import quote
+
 import networkx as nx
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    HAS_PYARROW = False
+else:
+    HAS_PYARROW = True
+
+try:
+    from numba import njit
+except ImportError:
+    HAS_NUMBA = False
+else:
+    HAS_NUMBA = True
+
+TRANSFER_DTYPES = {
+    "player_name": "string",
+    "position": "category",
+    "fee_cleaned": "float32",
+    "year": "int16",
+    "transfer_movement": "category",
+    "club_name": "string",
+    "club_involved_name": "string",
+}
+CHUNK_SIZE = 200_000
+REQUIRED_COLUMNS = ["fee_cleaned", "club_name", "club_involved_name"]
+CACHE_VERSION = 2
+
+
+def _bidirectional_bfs_csr(indptr, indices, reverse_indptr, reverse_indices, source, target):
+    """
+    Bidirectional breadth-first search over CSR arrays. It runs level by level from both ends,
+    always expanding the smaller frontier, and stops at the first club reached from both sides.
+    Visited marks use bit 1 for clubs reached from the source and bit 2 for clubs reached from
+    the target. The function is compiled with numba when numba is installed and runs as plain
+    Python otherwise.
+
+    Parameters
+    ----------
+    indptr, indices : np.ndarray
+        CSR arrays of the transfer graph.
+    reverse_indptr, reverse_indices : np.ndarray
+        CSR arrays of the reversed transfer graph.
+    source : int
+        Id of the club to start from.
+    target : int
+        Id of the club to reach.
+
+    Returns
+    -------
+    np.ndarray
+        Club ids in the shortest path, or an empty array if none exists.
+    """
+    num_clubs = indptr.size - 1
+    if source == target:
+        return np.full(1, source, dtype=np.int32)
+
+    visited = np.zeros(num_clubs, dtype=np.uint8)
+    parents = np.full(num_clubs, -1, dtype=np.int32)
+    children = np.full(num_clubs, -1, dtype=np.int32)
+    visited[source] = 1
+    visited[target] = 2
+
+    forward_fringe = np.empty(num_clubs, dtype=np.int32)
+    reverse_fringe = np.empty(num_clubs, dtype=np.int32)
+    next_fringe = np.empty(num_clubs, dtype=np.int32)
+    forward_fringe[0] = source
+    reverse_fringe[0] = target
+    forward_size = 1
+    reverse_size = 1
+    meeting = -1
+
+    while forward_size > 0 and reverse_size > 0 and meeting < 0:
+        next_size = 0
+        if forward_size <= reverse_size:
+            for i in range(forward_size):
+                current = forward_fringe[i]
+                for edge in range(indptr[current], indptr[current + 1]):
+                    neighbor = indices[edge]
+                    if (visited[neighbor] & 1) == 0:
+                        visited[neighbor] |= 1
+                        parents[neighbor] = current
+                        if (visited[neighbor] & 2) != 0:
+                            meeting = neighbor
+                            break
+                        next_fringe[next_size] = neighbor
+                        next_size += 1
+                if meeting >= 0:
+                    break
+            forward_fringe, next_fringe = next_fringe, forward_fringe
+            forward_size = next_size
+        else:
+            for i in range(reverse_size):
+                current = reverse_fringe[i]
+                for edge in range(reverse_indptr[current], reverse_indptr[current + 1]):
+                    neighbor = reverse_indices[edge]
+                    if (visited[neighbor] & 2) == 0:
+                        visited[neighbor] |= 2
+                        children[neighbor] = current
+                        if (visited[neighbor] & 1) != 0:
+                            meeting = neighbor
+                            break
+                        next_fringe[next_size] = neighbor
+                        next_size += 1
+                if meeting >= 0:
+                    break
+            reverse_fringe, next_fringe = next_fringe, reverse_fringe
+            reverse_size = next_size
+
+    if meeting < 0:
+        return np.empty(0, dtype=np.int32)
+
+    forward_length = 0
+    current = meeting
+    while current != -1:
+        forward_length += 1
+        current = parents[current]
+    reverse_length = 0
+    current = children[meeting]
+    while current != -1:
+        reverse_length += 1
+        current = children[current]
+
+    path = np.empty(forward_length + reverse_length, dtype=np.int32)
+    current = meeting
+    for i in range(forward_length - 1, -1, -1):
+        path[i] = current
+        current = parents[current]
+    current = children[meeting]
+    for i in range(forward_length, forward_length + reverse_length):
+        path[i] = current
+        current = children[current]
+    return path
+
+
+if HAS_NUMBA:
+    _bidirectional_bfs_csr = njit(cache=True)(_bidirectional_bfs_csr)
+
+
 class EuropeanFootballMarket:
     """
     A class to represent a European football market.
@@ -12,60 +158,235 @@ class EuropeanFootballMarket:
         Initializes the EuropeanFootballMarket with player data from a CSV file.
         The CSV file should contain player transfer data including player name, position, transfer fee, year, and clubs involved.
         The data is stored in a directed graph where nodes are clubs and edges represent transfers between clubs.
+        The graph is stored in compressed sparse row (CSR) form: clubs are numbered by club_ids,
+        the successors of club i are indices[indptr[i]:indptr[i + 1]], and the transfers of the edge
+        at position e in indices are rows transfer_ptr[e]:transfer_ptr[e + 1] of the transfers columns.
+        reverse_indptr and reverse_indices hold the same graph with every edge reversed, so the clubs
+        that sold players to club i are reverse_indices[reverse_indptr[i]:reverse_indptr[i + 1]].
         """
-        self.graph = nx.DiGraph()
+        self.club_names = []
+        self.club_ids = {}
+        self.indptr = np.zeros(1, dtype=np.int32)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.transfer_ptr = np.zeros(1, dtype=np.int32)
+        self.transfers = {}
+        self.reverse_indptr = np.zeros(1, dtype=np.int32)
+        self.reverse_indices = np.zeros(0, dtype=np.int32)
+        self._shortest_path = lru_cache(maxsize=4096)(self._find_shortest_path)
+        self.degrees = np.zeros(0, dtype=np.int64)
+        self._degree_ranking = np.zeros(0, dtype=np.intp)
 
         self.transfer_files = ['1-bundesliga.csv', 'championship.csv', 'eredivisie.csv', 'premier-liga.csv', 'ligue-1.csv', 
                                'premier-league.csv', 'serie-a.csv', 'liga-nos.csv', 'primera-division.csv']
+        self.cache_path = 'market.pkl'
         
     def read_all_data(self):
         """
         Reads player data from multiple CSV files and constructs a directed graph.
+        The files are parsed concurrently on a thread pool, since pandas releases
+        the GIL while parsing. The built graph is saved to cache_path and reused
+        on later runs as long as it is newer than every transfer file. Set
+        cache_path to None to disable the cache.
+
+        Returns
+        -------
+        None
+        """
+        if not self._load_cache():
+            with ThreadPoolExecutor(max_workers=len(self.transfer_files)) as executor:
+                frames = list(executor.map(self._read_file, self.transfer_files))
+
+            self._build_graph(pd.concat(frames, ignore_index=True))
+            self._save_cache()
+
+        self._shortest_path.cache_clear()
+
+        out_degrees = np.diff(self.indptr)
+        in_degrees = np.diff(self.reverse_indptr)
+        self.degrees = out_degrees + in_degrees
+        self._degree_ranking = np.argsort(-self.degrees, kind="stable")
+
+    def _load_cache(self):
+        """
+        Loads the graph arrays from cache_path if the cache is up to date.
+        A cache that cannot be unpickled, for example one written under another
+        NumPy version, or that does not hold the expected dict is ignored.
+
+        Returns
+        -------
+        bool
+            True if the graph was loaded from the cache.
+        """
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return False
+
+        cache_mtime = os.path.getmtime(self.cache_path)
+        if any(os.path.getmtime(file) > cache_mtime for file in self.transfer_files):
+            return False
+
+        try:
+            with open(self.cache_path, "rb") as f:
+                cache = pickle.load(f)
+        except (OSError, EOFError, ImportError, AttributeError, pickle.UnpicklingError):
+            return False
+        if not isinstance(cache, dict):
+            return False
+        if cache.get("version") != CACHE_VERSION or cache.get("transfer_files") != self.transfer_files:
+            return False
+
+        self.club_names = cache["club_names"]
+        self.club_ids = {club: i for i, club in enumerate(self.club_names)}
+        self.indptr = cache["indptr"]
+        self.indices = cache["indices"]
+        self.transfer_ptr = cache["transfer_ptr"]
+        self.transfers = cache["transfers"]
+        self.reverse_indptr = cache["reverse_indptr"]
+        self.reverse_indices = cache["reverse_indices"]
+        return True
+
+    def _save_cache(self):
+        """
+        Saves the graph arrays to cache_path, tagged with CACHE_VERSION. Bump
+        CACHE_VERSION whenever the stored layout changes, so older caches are rebuilt.
 
         Returns
         -------
         None
         """
-        for file in self.transfer_files:
-            self._read_file(file)
+        if self.cache_path is None:
+            return
+
+        cache = {
+            "version": CACHE_VERSION,
+            "transfer_files": self.transfer_files,
+            "club_names": self.club_names,
+            "indptr": self.indptr,
+            "indices": self.indices,
+            "transfer_ptr": self.transfer_ptr,
+            "transfers": self.transfers,
+            "reverse_indptr": self.reverse_indptr,
+            "reverse_indices": self.reverse_indices,
+        }
+        with open(self.cache_path, "wb") as f:
+            pickle.dump(cache, f, protocol=5)
 
     def _read_file(self, file_path):
         """
-        Reads a CSV file and constructs a directed graph.
+        Reads a CSV file and keeps the transfers that have a known fee and both clubs.
+        Rows missing the fee, club_name or club_involved_name are dropped, since a
+        transfer without both clubs cannot be placed as an edge in the graph.
+        When pyarrow is installed the file is parsed by its multithreaded CSV reader,
+        which does not support chunking. Otherwise the file is parsed in chunks of
+        CHUNK_SIZE rows and each chunk is filtered before it is kept, so dropped rows
+        never accumulate in memory.
 
         Parameters
         ----------
         file_path : str
             Path to the CSV file.
 
+        Returns
+        -------
+        pd.DataFrame
+            Transfers from the file with a non-null fee and non-null clubs.
+        """
+        if HAS_PYARROW:
+            df = pd.read_csv(file_path, usecols=list(TRANSFER_DTYPES), dtype=TRANSFER_DTYPES, engine="pyarrow")
+            return df.dropna(subset=REQUIRED_COLUMNS)
+
+        chunks = pd.read_csv(file_path, usecols=list(TRANSFER_DTYPES), dtype=TRANSFER_DTYPES, chunksize=CHUNK_SIZE)
+        return pd.concat((chunk.dropna(subset=REQUIRED_COLUMNS) for chunk in chunks), ignore_index=True)
+
+    def _build_graph(self, df):
+        """
+        Builds the CSR graph and the transfer columns from a DataFrame of transfers.
+        Fees are kept as float32 and years as int16, so the records returned by
+        get_transfers_between carry NumPy scalars rather than Python floats and ints.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Transfers as read by _read_file.
+
         Returns
         -------
         None
         """
+        incoming = df["transfer_movement"].to_numpy() == "in"
+        club_name = df["club_name"].to_numpy()
+        club_involved_name = df["club_involved_name"].to_numpy()
+        from_clubs = np.where(incoming, club_involved_name, club_name)
+        to_clubs = np.where(incoming, club_name, club_involved_name)
+
+        club_codes, club_names = pd.factorize(np.concatenate([from_clubs, to_clubs]), sort=True)
+        club_codes = club_codes.astype(np.int32)
+        from_ids, to_ids = np.split(club_codes, 2)
+        self.club_names = club_names.tolist()
+        self.club_ids = {club: i for i, club in enumerate(self.club_names)}
+
+        order = np.lexsort((to_ids, from_ids))
+        from_ids = from_ids[order]
+        to_ids = to_ids[order]
+        new_edge = np.ones(len(order), dtype=bool)
+        new_edge[1:] = (from_ids[1:] != from_ids[:-1]) | (to_ids[1:] != to_ids[:-1])
+        edge_starts = np.flatnonzero(new_edge)
+
+        self.indices = to_ids[edge_starts]
+        self.indptr = np.zeros(len(self.club_names) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(from_ids[edge_starts], minlength=len(self.club_names)), out=self.indptr[1:])
+        self.transfer_ptr = np.append(edge_starts, len(order)).astype(np.int32)
+
+        self.transfers = {
+            "player_name": self._shared_strings(df["player_name"])[order],
+            "position": self._shared_strings(df["position"])[order],
+            "fee": df["fee_cleaned"].to_numpy(dtype=np.float32)[order],
+            "year": df["year"].to_numpy(dtype=np.int16)[order],
+        }
+        self.reverse_indptr, self.reverse_indices = self._reverse_csr()
 
-        df = pd.read_csv(file_path)
+    @staticmethod
+    def _shared_strings(column):
+        """
+        Converts a string column to an object array in which equal values share one interned
+        str object, instead of each row holding its own copy. Missing values are kept as missing.
+
+        Parameters
+        ----------
+        column : pd.Series
+            Column of strings.
 
-        for _, transfer in df.iterrows():
-            if not pd.isna(transfer["fee_cleaned"]):
-                player_name = transfer["player_name"]
-                position = transfer["position"]
-                fee = transfer["fee_cleaned"]
-                year = transfer["year"]
-                if transfer["transfer_movement"] ==  "in":
-                    to_club = transfer["club_name"]
-                    from_club = transfer["club_involved_name"]
-                else:
-                    from_club = transfer["club_name"]
-                    to_club = transfer["club_involved_name"]
+        Returns
+        -------
+        np.ndarray
+            Object array of interned strings.
+        """
+        codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        pool = np.array(
+            [sys.intern(value) if isinstance(value, str) else value for value in uniques], dtype=object
+        )
+        return pool[codes]
 
-            
-                self._add_transfer(from_club, to_club, player_name, position, fee, year)
+    def _reverse_csr(self):
+        """
+        Builds the CSR arrays of the reversed graph, where the neighbors of a club
+        are the clubs that sold players to it.
 
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            The indptr and indices arrays of the reversed graph.
+        """
+        num_clubs = len(self.club_names)
+        sources = np.repeat(np.arange(num_clubs, dtype=np.int32), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind="stable")
 
+        reverse_indptr = np.zeros(num_clubs + 1, dtype=np.int32)
+        np.cumsum(np.bincount(self.indices, minlength=num_clubs), out=reverse_indptr[1:])
+        return reverse_indptr, sources[order]
 
-    def _add_transfer(self, from_club, to_club, player_name, position, fee, year):
+    def _edge_id(self, from_club, to_club):
         """
-        Adds a transfer to the directed graph.
+        Finds the position of an edge in the CSR indices array.
 
         Parameters
         ----------
@@ -73,29 +394,58 @@ class EuropeanFootballMarket:
             Name of the club the player is transferring from.
         to_club : str
             Name of the club the player is transferring to.
-        player_name : str
-            Name of the player.
-        position : str
-            Position of the player.
-        fee : float
-            Transfer fee.
-        year : int
-            Year of transfer.
 
         Returns
         -------
-        None
+        int or None
+            Edge id, or None if there is no such edge.
         """
-        transfer_data = {
-            "player_name": player_name,
-            "position": position,
-            "fee": fee,
-            "year": year
-        }
-        if self.graph.has_edge(from_club, to_club):
-            self.graph[from_club][to_club]['transfers'].append(transfer_data)
-        else:
-            self.graph.add_edge(from_club, to_club, transfers=[transfer_data])
+        from_id = self.club_ids.get(from_club)
+        to_id = self.club_ids.get(to_club)
+        if from_id is None or to_id is None:
+            return None
+
+        start, end = self.indptr[from_id], self.indptr[from_id + 1]
+        position = start + np.searchsorted(self.indices[start:end], to_id)
+        if position == end or self.indices[position] != to_id:
+            return None
+        return int(position)
+
+    def _edge_transfers(self, edge_id):
+        """
+        Assembles the transfer records of an edge from the transfer columns.
+
+        Parameters
+        ----------
+        edge_id : int
+            Position of the edge in the CSR indices array.
+
+        Returns
+        -------
+        list[dict]
+            List of transfers containing player name, position, fee, and year.
+        """
+        return [
+            {key: column[row] for key, column in self.transfers.items()}
+            for row in range(self.transfer_ptr[edge_id], self.transfer_ptr[edge_id + 1])
+        ]
+
+    def to_networkx(self):
+        """
+        Exports the transfer graph as a networkx DiGraph, for algorithms not implemented here.
+
+        Returns
+        -------
+        nx.DiGraph
+            Directed graph where nodes are clubs and each edge has a 'transfers' attribute.
+        """
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.club_names)
+        for from_id, from_club in enumerate(self.club_names):
+            for edge_id in range(self.indptr[from_id], self.indptr[from_id + 1]):
+                to_club = self.club_names[self.indices[edge_id]]
+                graph.add_edge(from_club, to_club, transfers=self._edge_transfers(edge_id))
+        return graph
 
     def get_transfers_between(self, from_club, to_club):
         """
@@ -113,11 +463,11 @@ class EuropeanFootballMarket:
         list[dict]
             List of transfers containing player name, position, fee, and year.
         """
-        if not self.graph.has_edge(from_club, to_club):
+        edge_id = self._edge_id(from_club, to_club)
+        if edge_id is None:
             return []
 
-        transfers = self.graph[from_club][to_club]['transfers']
-        return transfers
+        return self._edge_transfers(edge_id)
 
     def print_transfers_between(self, from_club, to_club):
         """
@@ -143,7 +493,28 @@ class EuropeanFootballMarket:
         
         print(f"Transfers from {from_club} to {to_club}:")
         for transfer in transfers:
-            print(f"- {transfer['year']}: {transfer['player_name']} ({transfer['position']}) for €{transfer['fee']}")
+            print(f"- {transfer['year']}: {transfer['player_name']} ({transfer['position']}) for €{transfer['fee']:g}")
+
+    def clubs_selling_to(self, club_name):
+        """
+        Returns the clubs that have sold at least one player to a given club.
+
+        Parameters
+        ----------
+        club_name : str
+            Name of the buying club.
+
+        Returns
+        -------
+        list[str]
+            Names of the selling clubs, in alphabetical order.
+        """
+        club = self.club_ids.get(club_name)
+        if club is None:
+            return []
+
+        sellers = self.reverse_indices[self.reverse_indptr[club]:self.reverse_indptr[club + 1]]
+        return [self.club_names[seller] for seller in sellers.tolist()]
 
     def get_shortest_path(self, from_club, to_club):
         """
@@ -161,30 +532,38 @@ class EuropeanFootballMarket:
         list[str]
             List of clubs in the shortest path.
         """
-        if from_club not in self.graph.nodes or to_club not in self.graph.nodes:
+        if from_club not in self.club_ids or to_club not in self.club_ids:
             print("One or both clubs not found in the network.")
             return []
     
-        visited = set()
-        queue = [[from_club]]
+        path = self._shortest_path(self.club_ids[from_club], self.club_ids[to_club])
+        if not path:
+            print(f"No path exists between {from_club} and {to_club}.")
+        return [self.club_names[club] for club in path]
 
-        while queue:
-            path = queue.pop(0)
-            current = path[-1]
+    def _find_shortest_path(self, source, target):
+        """
+        Runs a bidirectional breadth-first search between two club ids with the
+        _bidirectional_bfs_csr kernel. Results are memoized by get_shortest_path
+        until the graph is rebuilt.
 
-            if current == to_club:
-                return path
+        Parameters
+        ----------
+        source : int
+            Id of the club to start from.
+        target : int
+            Id of the club to reach.
 
-            if current not in visited:
-                visited.add(current)
-                for neighbor in self.graph.successors(current):
-                    if neighbor not in visited:
-                        new_path = path + [neighbor]
-                        queue.append(new_path)
+        Returns
+        -------
+        tuple[int, ...]
+            Club ids in the shortest path, or an empty tuple if none exists.
+        """
+        path = _bidirectional_bfs_csr(
+            self.indptr, self.indices, self.reverse_indptr, self.reverse_indices, source, target
+        )
+        return tuple(path.tolist())
 
-        print(f"No path exists between {from_club} and {to_club}.")
-        return []
-    
     def most_connected_clubs(self, top_n=10):
         """
         Returns the top clubs with the most connections in the graph.
@@ -200,13 +579,14 @@ class EuropeanFootballMarket:
         list[tuple[str, int]]
             List of tuples containing club names and their degree (number of connections).
         """
-        degrees = self.graph.degree()
-        sorted_degrees = sorted(degrees, key=lambda x: x[1], reverse=True)
-        return sorted_degrees[:top_n]
+        return [(self.club_names[club], int(self.degrees[club])) for club in self._degree_ranking[:top_n]]
     
-    def link_wikipedia(self, club_name):
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def link_wikipedia(club_name):
         """
         Returns the Wikipedia link for a given club.
+        Spaces become underscores and any other special characters are percent-encoded.
 
         Parameters
         ----------
@@ -219,7 +599,7 @@ class EuropeanFootballMarket:
             Wikipedia link for the club.
         """
         base_url = "https://en.wikipedia.org/wiki/"
-        formatted_name = club_name.replace(" ", "_")
+        formatted_name = quote(club_name.replace(" ", "_"))
         return f"{base_url}{formatted_name}"
 
 
@@ -235,7 +615,7 @@ if __name__ == "__main__":
     market = EuropeanFootballMarket()
     market.read_all_data()
     
-    print(f"\nLoaded {market.graph.number_of_nodes()} clubs and {market.graph.number_of_edges()} transfer connections.\n")
+    print(f"\nLoaded {len(market.club_names)} clubs and {len(market.indices)} transfer connections.\n")
 
     while True:
         print("\n--- European Football Transfer Market ---")